@@ -6,9 +6,6 @@ roommodes is a program to place speakers in rectangular rooms.
     position. Speaker is considered to be a point source, and an
     omnidirectional radiator.
 """
-import typing
-from   typing import *
-
 min_py = (3, 11)
 
 ###
@@ -25,21 +22,29 @@ if sys.version_info < min_py:
 ###
 import argparse
 import contextlib
-import getpass
-import itertools
+import functools
+import io
 import logging
 import math
-from   pprint import pprint
 import tomllib
 
+###
+# Installed libraries
+###
+import numpy as np
+
 ###
 # From hpclib
 ###
-import linuxutils
 from   sloppytree import SloppyTree
 from   urdecorators import trap
 from   urlogger import URLogger
 
+###
+# Kernels, precompiled if roommodes_kernels.py has been run.
+###
+from   roommodes_kernels import proximity_all as _proximity_all
+
 ###
 # Globals
 ###
@@ -62,7 +67,7 @@ __license__ = 'MIT'
 def axial_mode_freqs(dimension:float, 
     n:int=4, 
     cs:float=343,
-    cutoff:float=250) -> tuple:
+    cutoff:float=250) -> np.ndarray:
     """
     Calculate the axial mode frequency for the dimension given.
 
@@ -71,21 +76,38 @@ def axial_mode_freqs(dimension:float,
     cs        -- speed of sound in m/s
     cutoff    -- highest frequency to consider
 
-    returns   -- tuple of Hz
+    returns   -- array of Hz
+    """
+    half_cs = 0.5 * cs
+    freqs = half_cs * np.arange(1, n+1, dtype=np.float64) / dimension
+    return freqs[freqs < cutoff]
+
+
+def axial_modes_batch(dims:np.ndarray,
+    n:int=4,
+    cs:float=343,
+    cutoff:float=250,
+    /) -> np.ndarray:
     """
-    values = []
-    for i in range(1, n+1):
-        v = cs/2 * i/dimension
-        if v < cutoff:
-            values.append(v)
-        else:
-            break
+    Calculate the axial mode frequencies for several dimensions 
+    at once.
+
+    dims      -- array of dimensions in meters
+    n         -- number of harmonics to consider
+    cs        -- speed of sound in m/s
+    cutoff    -- highest frequency to consider
 
-    return values
+    returns   -- array of Hz, one row per dimension. Frequencies at
+                 or above the cutoff are NaN.
+    """
+    dims = np.asarray(dims, dtype=np.float64)
+    freqs = (0.5 * cs) * np.arange(1, n+1, dtype=np.float64)[None, :] / dims[:, None]
+    freqs[freqs >= cutoff] = np.nan
+    return freqs
 
 
 def complex_mode_freq(*, n:int=4, cutoff=250,
-    length:float=0, width:float=0, height:float=0, cs:float=343) -> tuple:
+    length:float=0, width:float=0, height:float=0, cs:float=343) -> np.ndarray:
     """
     Calculate oblique or tangential mode frequencies.
 
@@ -96,20 +118,12 @@ def complex_mode_freq(*, n:int=4, cutoff=250,
     width   -- *- dimensions of the room.
     height  --/
 
-    returns -- tuple of up to n frequencies
+    returns -- array of up to n frequencies
     """
-    values = []
-
-    for i in range(1, n+1):
-        v = ( (cs/2) * math.sqrt(
-            (i/length)**2 + (i/width)**2 + (i/height)**2
-            ))
-        if v < cutoff:
-            values.append(v)
-        else:
-            break
-
-    return tuple(values)
+    half_cs = 0.5 * cs
+    k = 1/length**2 + 1/width**2 + 1/height**2
+    v = (half_cs * math.sqrt(k)) * np.arange(1, n+1, dtype=np.float64)
+    return v[v < cutoff]
 
 
 def run_simulation(t:SloppyTree) -> dict:
@@ -118,52 +132,80 @@ def run_simulation(t:SloppyTree) -> dict:
     proximity of the speakers to mode-positions.
     """
 
-    t.dimensions.length.dim = t.dimensions.length
-    t.dimensions.width.dim = t.dimensions.width
-    t.dimensions.heigth.dim = t.dimensions.height
-    t.dimensions.length.modes = axial_mode_freqs(t.dimensions.length.dim, t.n, t.cs, t.lowpass)
-    t.dimensions.width.modes  = axial_mode_freqs(t.dimensions.width.dim, t.n, t.cs, t.lowpass)
-    t.dimensions.height.modes = axial_mode_freqs(t.dimensions.height.dim, t.n, t.cs, t.lowpass)
-    
-    proximity_x, proximity_y, proximity_z = ([], [], [])
+    length = t.dimensions.length
+    width  = t.dimensions.width
+    height = t.dimensions.height
+    cs     = t.cs
+    n      = t.n
+    cutoff = t.lowpass
+
+    dims  = np.array([length, width, height], dtype=np.float64)
+    modes = axial_modes_batch(dims, n, cs, cutoff)
 
-    for i, f in enumerate(t.dimensions.length.modes):
-        wavelength = t.cs / f
-        node_positions = [(n*wavelength)/2 for n in range(1, 
+    answer = calculate_speaker_position(modes,
+        np.array([t.xpos, t.ypos, t.zpos], dtype=np.float64),
+        dims, cs)
 
-    for i, f in enumerate(modes_x, 1):
-        wavelength = cs / f
-        node_positions = [(n * wavelength / 2) for n in range(1, int(length / (wavelength / 2)) + 1)]
-        distances = [abs(x_pos - node_pos) for node_pos in node_positions]
-        proximity_x.append((min(distances), f))
+    t.modes.x, t.modes.y, t.modes.z = (row[~np.isnan(row)] for row in modes)
+    return answer
 
-    for i, f in enumerate(modes_y, 1):
-        wavelength = cs / f
-        node_positions = [(n * wavelength / 2) for n in range(1, int(length / (wavelength / 2)) + 1)]
-        distances = [abs(y_pos - node_pos) for node_pos in node_positions]
-        proximity_y.append((min(distances), f))
 
-    for i, f in enumerate(modes_z, 1):
-        wavelength = cs / f
-        node_positions = [(n * wavelength / 2) for n in range(1, int(length / (wavelength / 2)) + 1)]
-        distances = [abs(z_pos - node_pos) for node_pos in node_positions]
-        proximity_z.append((min(distances), f))
+def calculate_speaker_position(modes:np.ndarray, 
+    positions:np.ndarray,
+    dims:np.ndarray,
+    cs:float=343) -> dict:
+    """
+    For each axial mode, find the distance from the speaker to the
+    nearest node of that mode.
 
-    return {
-        'x' : proximity_x,
-        'y' : proximity_y,
-        'z' : proximity_z
-        }
+    modes     -- axial mode frequencies, one row per dimension, 
+                 padded with NaN as axial_modes_batch returns them.
+    positions -- x, y, z position of the speaker in meters
+    dims      -- length, width, height of the room in meters
+    cs        -- speed of sound in m/s
 
+    returns   -- dict keyed by axis of (modes, 2) arrays; column 0 is
+                 the distance to the nearest node, column 1 the 
+                 frequency.
+    """
+    modes = np.ascontiguousarray(modes, dtype=np.float64)
+    proximity = _proximity_all(np.asarray(dims, dtype=np.float64),
+        np.asarray(positions, dtype=np.float64), modes, cs)
 
-def reporter(t:SloppyTree) -> None:
-    pass
+    answer = {}
+    for axis, p, f in zip('xyz', proximity, modes):
+        keep = ~np.isnan(f)
+        answer[axis] = np.column_stack((p[keep], f[keep]))
+    return answer
 
 
+def reporter(answer:dict) -> None:
+    """
+    Write the results of run_simulation to stdout in a single write.
+    """
+    buffer = io.StringIO()
+    for axis, table in answer.items():
+        buffer.write(f'{axis}:\n')
+        np.savetxt(buffer, table, fmt='%12.3f', delimiter='',
+            header=f"{'distance':>12}{'frequency':>12}", comments='')
+    sys.stdout.write(buffer.getvalue())
+
+
+@functools.lru_cache(maxsize=256)
 def speed_of_sound(temperature:float, humidity:float) -> float:
     return 331.3 * math.sqrt(1+temperature/273.15) * (1 + 0.0124 * humidity)
 
 
+def speed_of_sound_arr(temperature:np.ndarray, humidity:np.ndarray) -> np.ndarray:
+    """
+    Vectorized speed_of_sound for sweeps over temperature and
+    humidity. Arguments broadcast against each other.
+    """
+    T = np.asarray(temperature, dtype=np.float64)
+    H = np.asarray(humidity, dtype=np.float64)
+    return 331.3 * np.sqrt(1.0 + T * (1.0/273.15)) * (1.0 + 0.0124 * H)
+
+
 @trap
 def roommodes_main(myargs:SloppyTree) -> int:
     """
@@ -175,7 +217,7 @@ def roommodes_main(myargs:SloppyTree) -> int:
         logger.error("x, y, and z should all be non-negative")
         config_error = True
 
-    if not all(v > 0 for _, v in myargs.dimensions.items()):
+    if not all(v > 0 for v in myargs.dimensions.values()):
         logger.error("height, width, and length should all be non-negative")
         config_error = True
 
@@ -190,7 +232,7 @@ def roommodes_main(myargs:SloppyTree) -> int:
     myargs.cs = speed_of_sound(myargs.temp, myargs.rh)
     logger.info(f"Speed of sound is {myargs.cs} m/s")
     answer = run_simulation(myargs)
-    reported(answer)
+    reporter(answer)
 
     return os.EX_OK
 
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Numerical kernels for roommodes.
+
+    To compile the kernels ahead of time, run this file directly:
+
+        python roommodes_kernels.py
+
+    The result is a shared object named _roommodes_aot next to this
+    file. When it can be imported, its kernels are used and roommodes
+    pays no JIT cost at startup. Otherwise the kernels are JIT
+    compiled by numba, or run as plain Python if numba is not
+    installed. Rebuild after changing a kernel or its signature.
+"""
+
+###
+# Standard imports, starting with os and sys
+###
+import os
+import sys
+
+###
+# Other standard distro imports
+###
+import math
+
+###
+# Installed libraries
+###
+import numpy as np
+try:
+    from numba import njit, prange
+except ImportError:
+    # Without numba, the kernels run as ordinary Python.
+    prange = range
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda f: f
+
+
+###
+# Signatures shared by the JIT and AOT builds.
+###
+PROXIMITY_ALL_SIG = 'f8[:,:](f8[:],f8[:],f8[:,:],f8)'
+
+
+def _proximity_all(dims:np.ndarray, pos:np.ndarray, 
+    modes:np.ndarray, cs:float) -> np.ndarray:
+    """
+    Distance from pos[a] to the nearest node of each mode along
+    dims[a]. Nodes are at k * (wavelength/2) for k = 1 .. k_max,
+    so the nearest one is found by rounding pos[a] to the grid and
+    clamping k to that range.
+
+    Row a of modes holds the modes of dims[a], padded with NaN; the
+    padding is carried through to the result. The rows are
+    independent, so they are computed in parallel.
+    """
+    out = np.empty_like(modes)
+    for a in prange(modes.shape[0]):
+        for j in range(modes.shape[1]):
+            f = modes[a, j]
+            if math.isnan(f):
+                out[a, j] = math.nan
+                continue
+            half_wl = 0.5 * cs / f
+            kmax = int(dims[a] / half_wl)
+            k = max(1, min(kmax, int(round(pos[a] / half_wl))))
+            out[a, j] = abs(pos[a] - k * half_wl)
+    return out
+
+
+def build() -> int:
+    """
+    Compile the kernels to a shared object beside this file.
+    """
+    from numba.pycc import CC
+
+    cc = CC('_roommodes_aot')
+    cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+    cc.export('proximity_all', PROXIMITY_ALL_SIG)(_proximity_all)
+    cc.compile()
+    return os.EX_OK
+
+
+try:
+    from _roommodes_aot import proximity_all
+except ImportError:
+    # No fastmath here: it lets LLVM assume there are no NaNs.
+    proximity_all = njit(PROXIMITY_ALL_SIG, cache=True, parallel=True)(_proximity_all)
+
+
+if __name__ == '__main__':
+    sys.exit(build())
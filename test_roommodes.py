@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the mode calculations in roommodes.
+"""
+import math
+
+import pytest
+
+###
+# roommodes imports hpclib at module level.
+###
+pytest.importorskip('sloppytree')
+pytest.importorskip('urdecorators')
+pytest.importorskip('urlogger')
+
+import numpy as np
+
+import roommodes
+
+
+def baseline_axial_mode_freqs(dimension, n, cs, cutoff):
+    """
+    The original loop from axial_mode_freqs.
+    """
+    values = []
+    for i in range(1, n+1):
+        v = cs/2 * i/dimension
+        if v < cutoff:
+            values.append(v)
+        else:
+            break
+    return values
+
+
+def test_axial_modes_match_baseline_at_cutoff():
+    """
+    Put the cutoff exactly on a harmonic, where the rounding of
+    the frequency decides whether it is kept.
+    """
+    rng = np.random.default_rng(6)
+    for _ in range(5000):
+        dim = round(rng.uniform(1.0, 12.0), 2)
+        cs = round(rng.uniform(330.0, 350.0), 1)
+        n = int(rng.integers(1, 9))
+        cutoff = cs/2 * int(rng.integers(1, n+1))/dim
+        expected = baseline_axial_mode_freqs(dim, n, cs, cutoff)
+
+        single = roommodes.axial_mode_freqs(dim, n, cs, cutoff)
+        row = roommodes.axial_modes_batch(np.array([dim]), n, cs, cutoff)[0]
+        assert single.tolist() == expected
+        assert row[~np.isnan(row)].tolist() == expected
+
+
+def test_axial_mode_freqs_boundary_example():
+    cutoff = 331.3/2*3/6.3
+    assert len(roommodes.axial_mode_freqs(6.3, 3, 331.3, cutoff)) == 2
+
+
+def baseline_complex_mode_freq(n, cutoff, length, width, height, cs):
+    """
+    The original loop from complex_mode_freq.
+    """
+    values = []
+    for i in range(1, n+1):
+        v = ( (cs/2) * math.sqrt(
+            (i/length)**2 + (i/width)**2 + (i/height)**2
+            ))
+        if v < cutoff:
+            values.append(v)
+        else:
+            break
+    return values
+
+
+def test_complex_mode_freq_matches_baseline():
+    rng = np.random.default_rng(9)
+    for _ in range(1000):
+        length, width, height = rng.uniform(1.0, 12.0, 3)
+        cs = rng.uniform(330.0, 350.0)
+        n = int(rng.integers(1, 9))
+        cutoff = rng.uniform(20.0, 400.0)
+        expected = baseline_complex_mode_freq(n, cutoff, length, width, height, cs)
+        v = roommodes.complex_mode_freq(n=n, cutoff=cutoff,
+            length=length, width=width, height=height, cs=cs)
+        assert len(v) == len(expected)
+        assert np.allclose(v, expected)
+
+
+def test_speaker_position_columns():
+    """
+    Each axis maps to an (modes, 2) array of distance and frequency,
+    with the modes above the cutoff dropped.
+    """
+    dims = np.array([8.4, 6.1, 2.5])
+    modes = roommodes.axial_modes_batch(dims, 4, 345.0, 250.0)
+    answer = roommodes.calculate_speaker_position(modes, [0.75, 1.3, 0.67], dims, 345.0)
+
+    assert list(answer) == ['x', 'y', 'z']
+    assert [answer[k].shape for k in 'xyz'] == [(4, 2), (4, 2), (3, 2)]
+    for k, row in zip('xyz', modes):
+        assert np.array_equal(answer[k][:, 1], row[~np.isnan(row)])
+    assert np.allclose(answer['x'][:, 0], [7.65, 3.45, 2.05, 1.35])
+    assert np.allclose(answer['z'][:, 0], [1.83, 0.58, 0.49/3])
+
+
+def test_reporter_output(capsys):
+    roommodes.reporter({
+        'x' : np.array([[7.65, 20.5357], [3.45, 41.0714]]),
+        'z' : np.empty((0, 2))
+        })
+    assert capsys.readouterr().out == (
+        "x:\n"
+        "    distance   frequency\n"
+        "       7.650      20.536\n"
+        "       3.450      41.071\n"
+        "z:\n"
+        "    distance   frequency\n"
+        )
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Regression tests for the closed-form nearest-node search in
+roommodes_kernels.
+"""
+import numpy as np
+import pytest
+
+from roommodes_kernels import proximity_all, _proximity_all
+
+
+def nearest_node(f:float, pos:float, dim:float, cs:float) -> float:
+    """
+    The original search: enumerate every node along dim and take
+    the closest one.
+    """
+    wavelength = cs / f
+    node_positions = [(n * wavelength / 2) for n in range(1, int(dim / (wavelength / 2)) + 1)]
+    return min(abs(pos - node_pos) for node_pos in node_positions)
+
+
+def test_closed_form_matches_enumeration():
+    rng = np.random.default_rng(2024)
+    n = 8
+    for _ in range(500):
+        dims = rng.uniform(1.0, 12.0, 3)
+        pos = dims * rng.uniform(0.0, 1.0, 3)
+        cs = rng.uniform(330.0, 350.0)
+        modes = (0.5 * cs) * np.arange(2, n+2)[None, :] / dims[:, None]
+        out = proximity_all(dims, pos, modes, cs)
+        for a in range(3):
+            for j in range(n):
+                assert np.isclose(out[a, j], nearest_node(modes[a, j], pos[a], dims[a], cs))
+
+
+def test_fundamental_rounding_clamps_to_wall():
+    """
+    For dim=1.29, cs=343 the fundamental's half wavelength rounds to
+    just above dim, so there are no nodes strictly inside the room.
+    The enumeration raised ValueError; the clamp reports the node
+    at the wall.
+    """
+    dims = np.array([1.29, 1.29, 1.29])
+    pos = np.array([0.3, 0.3, 0.3])
+    cs = 343.0
+    modes = np.full((3, 1), 0.5 * cs / 1.29)
+    assert int(dims[0] / (0.5 * cs / modes[0, 0])) == 0
+    out = proximity_all(dims, pos, modes, cs)
+    assert np.allclose(out[:, 0], 1.29 - 0.3)
+
+
+def test_nan_padding_is_preserved():
+    dims = np.array([8.4, 6.1, 2.5])
+    pos = np.array([0.75, 1.3, 0.67])
+    modes = np.array([[20.5, np.nan], [28.3, np.nan], [np.nan, np.nan]])
+    out = proximity_all(dims, pos, modes, 345.0)
+    assert np.array_equal(np.isnan(out), np.isnan(modes))
+
+
+def test_compiled_kernel_matches_python():
+    """
+    With numba installed, proximity_all is the JIT or AOT build;
+    check it against the plain Python body.
+    """
+    pytest.importorskip('numba')
+    assert proximity_all is not _proximity_all
+
+    rng = np.random.default_rng(13)
+    dims = rng.uniform(1.0, 12.0, 3)
+    pos = dims * rng.uniform(0.0, 1.0, 3)
+    modes = (0.5 * 343.0) * np.arange(1, 9)[None, :] / dims[:, None]
+    modes[modes >= 250.0] = np.nan
+    expected = _proximity_all(dims, pos, modes, 343.0)
+    assert np.array_equal(proximity_all(dims, pos, modes, 343.0), expected, equal_nan=True)